@@ -1,4 +1,7 @@
 """Parent class for all clients - DB and ML."""
+from io import StringIO
+
+import orjson
 import requests
 from pandas import read_json
 from mindsdb.integrations.libs.net_helpers import sending_attempts
@@ -48,7 +51,7 @@ class BaseClient:
         return getattr(self.handler, attr)
 
     def _convert_response(self, resp):
-        """Converts data_frame from json to pandas.DataFrame object.
+        """Converts data_frame from json (string or object) to pandas.DataFrame object.
         Does nothing if data_frame key is not present
         """
         if (
@@ -56,8 +59,12 @@ class BaseClient:
             and "data_frame" in resp
             and resp["data_frame"] is not None
         ):
-            df = read_json(resp["data_frame"], orient="split")
-            resp["data_frame"] = df
+            data_frame = resp["data_frame"]
+            if isinstance(data_frame, dict):
+                # streamed responses contain data_frame as an object, it is
+                # parsed by read_json too to get the same dtypes (e.g. dates)
+                data_frame = orjson.dumps(data_frame).decode("utf-8")
+            resp["data_frame"] = read_json(StringIO(data_frame), orient="split")
         return resp
 
     @sending_attempts()
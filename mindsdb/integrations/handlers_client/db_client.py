@@ -12,10 +12,9 @@ including calling params and returning types.
 
 """
 import os
-import base64
 import traceback
-import pickle
-import json
+
+import orjson
 
 from mindsdb.integrations.libs.response import (
     HandlerStatusResponse as StatusResponse,
@@ -25,6 +24,7 @@ from mindsdb.integrations.libs.response import (
 from mindsdb_sql.parser.ast.base import ASTNode
 from mindsdb.integrations.handlers_client.base_client import BaseClient, Switcher
 from mindsdb.integrations.libs.handler_helpers import get_handler
+from mindsdb.integrations.libs.ast_serializer import ast_to_dict
 from mindsdb.utilities.log import get_log
 
 logger = get_log(logger_name="main")
@@ -113,7 +113,7 @@ class DBServiceClient(BaseClient):
     def disconnect(self):
         logger.info("%s.disconnect: called", self.__class__.__name__)
         try:
-            r = self._do("/disconnect", json=self._context())
+            r = self._do("/disconnect", _type="post", json=self._context())
             if r.status_code == 200 and r.json()["status"] is True:
                 return True
         except Exception:
@@ -207,23 +207,17 @@ class DBServiceClient(BaseClient):
         """
         # Need to send json with context and
         # serialized query object
-        # it is not possible to send json and data separately
-        # so need use base64 to decode serialized object into string
-        s_query = pickle.dumps(query)
-        b64_s_query = base64.b64encode(s_query)
-        b64_s_query_str = b64_s_query.decode("utf-8")
         response = None
 
-        _json = self._context()
-        _json["query"] = b64_s_query_str
         logger.info(
-            "%s: calling 'query' for query - %s, json - %s",
-            self.__class__.__name__,
-            query,
-            _json,
+            "%s: calling 'query' for query - %s", self.__class__.__name__, query
         )
         try:
-            r = self._do("/query", data=json.dumps(_json))
+            _json = self._context()
+            _json["query_ast"] = ast_to_dict(query)
+            # orjson produces the body as bytes at once,
+            # the query object may be large
+            r = self._do("/query", _type="post", data=orjson.dumps(_json))
             r = self._convert_response(r.json())
             response = Response(
                 data_frame=r.get("data_frame", None),
@@ -1,5 +1,8 @@
 import os
-from mindsdb.integrations.handlers_wrapper.db_handler_wrapper import DBHandlerWrapper
+from mindsdb.integrations.handlers_wrapper.db_handler_wrapper import (
+    DBHandlerWrapper,
+    SERVER_THREADS,
+)
 from mindsdb.utilities.config import Config
 import mindsdb.interfaces.storage.db as db
 from mindsdb.utilities.log import initialize_log, get_log
@@ -13,5 +16,9 @@ if __name__ == "__main__":
     app = DBHandlerWrapper()
     port = int(os.environ.get("PORT", 5001))
     host = os.environ.get("HOST", "0.0.0.0")
-    logger.info("Running dbservice: host=%s, port=%s", host, port)
-    app.run(debug=True, host=host, port=port)
+    # each DB call blocks its server thread until the DB replies
+    threads = int(os.environ.get("THREADS", SERVER_THREADS))
+    logger.info(
+        "Running dbservice: host=%s, port=%s, threads=%s", host, port, threads
+    )
+    app.run(host=host, port=port, threads=threads)
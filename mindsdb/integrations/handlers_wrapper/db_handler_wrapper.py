@@ -15,38 +15,249 @@ Basic usage:
     port = int(os.environ.get('PORT', 5001))
     host = os.environ.get('HOST', '0.0.0.0')
     log.info("Running dbservice: host=%s, port=%s", host, port)
-    app.run(debug=True, host=host, port=port)
+    app.run(host=host, port=port)
 
 """
-import json
-import pickle
+import sys
+import time
+import logging
+import threading
 import traceback
-import base64
+from contextlib import contextmanager
+from functools import lru_cache
+from datetime import datetime
+from decimal import Decimal
 
-from flask import Flask, request
-from mindsdb.integrations.libs.response import (
-    HandlerStatusResponse as StatusResponse,
-    HandlerResponse as Response,
-    RESPONSE_TYPE,
-)
+import orjson
+import pandas as pd
+from flask import Flask, request, Response as FlaskResponse
+from flask.json import JSONEncoder
+from flask_compress import Compress
+from waitress import serve
+from mindsdb.integrations.libs.response import RESPONSE_TYPE
 from mindsdb.integrations.libs.handler_helpers import get_handler
+from mindsdb.integrations.libs.ast_serializer import dict_to_ast
 from mindsdb.utilities.log import get_log
 
 logger = get_log(logger_name="main")
 
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+# number of waitress threads, i.e. max number of concurrently executed DB calls
+SERVER_THREADS = 16
+
+# number of data_frame rows serialized at once in streamed responses,
+# results which fit into one batch are sent without streaming
+STREAM_BATCH_SIZE = 4096
+
+# error responses are built as prefix + JSON encoded message + b"}"
+# HandlerResponse(RESPONSE_TYPE.ERROR, error_code=1).to_json()
+HANDLER_ERROR_PREFIX = (
+    b'{"type":"error","query":0,"data_frame":null,"error_code":1,"error":'
+)
+# HandlerStatusResponse(success=False).to_json()
+STATUS_ERROR_PREFIX = b'{"success":false,"error":'
+# connect/disconnect
+CONNECT_ERROR_PREFIX = b'{"status":"FAIL","error":'
+
+# time (in seconds) and max number of cached results of metadata requests
+METADATA_CACHE_TTL = 30
+METADATA_CACHE_MAX_SIZE = 256
+
+# max number of connections with pooled handlers in a server thread
+POOL_MAX_CONNECTIONS = 8
+# time (in seconds) after which the handler of an unused connection is closed
+# by its thread, once the thread serves its next request
+POOL_IDLE_TTL = 300
+# time (in seconds) since the last connect or successful check
+# after which a pooled handler is checked before reuse
+POOL_CHECK_INTERVAL = 60
+
+
+def _default(obj):
+    """Serializes objects which orjson doesn't support natively."""
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, datetime):
+        # pandas.Timestamp
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    # timedelta, ASTNode in 'query' field, etc
+    return str(obj)
+
+
+def _dumps(obj):
+    return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+
+
+def _json_response(obj, status=200):
+    """Builds a JSON response from a dict without an intermediate str."""
+    return FlaskResponse(_dumps(obj), status=status, mimetype="application/json")
+
+
+def _get_payload():
+    """Parses JSON body of the current request with orjson.
+    Unlike request.json, the raw bytes are parsed without decoding them to str.
+    The body is read from the input stream and isn't cached on the request,
+    so only the parsed payload stays in memory after parsing.
+    """
+    return orjson.loads(request.stream.read())
+
+
+def _result_head(result):
+    """HandlerResponse fields except data_frame."""
+    return {
+        "type": result.resp_type,
+        "query": result.query,
+        "error_code": result.error_code,
+        "error": result.error_message,
+    }
+
+
+def _iter_result(result):
+    """Yields HandlerResponse serialized as JSON by chunks, so only one batch
+    of data_frame rows is serialized and kept in memory at a time.
+    data_frame is sent as {"columns": [...], "data": [[...], ...]}.
+    """
+    head = _result_head(result)
+    df = result.data_frame
+    if df is None:
+        yield _dumps(dict(head, data_frame=None))
+        return
+
+    # drop closing '}' of head to add data_frame to it
+    columns = _dumps(list(df.columns))
+    yield _dumps(head)[:-1] + b',"data_frame":{"columns":' + columns + b',"data":['
+    for start in range(0, len(df), STREAM_BATCH_SIZE):
+        end = start + STREAM_BATCH_SIZE
+        batch = df.iloc[start:end]
+        rows = b",".join(
+            _dumps(row) for row in batch.itertuples(index=False, name=None)
+        )
+        yield rows if start == 0 else b"," + rows
+    yield b"]}}"
+
+
+def _stream_response(result, status=200):
+    """Streams HandlerResponse as JSON (see _iter_result).
+
+    Serialization happens when the response is sent, so the handler
+    which produced the result is already returned to the pool.
+    """
+    if result.data_frame is None:
+        return _json_response(dict(_result_head(result), data_frame=None), status)
+    return _chunked_response(_iter_result(result), len(result.data_frame), status)
+
+
+def _chunked_response(chunks, rows, status=200):
+    """Streams JSON chunks if there are more than STREAM_BATCH_SIZE rows.
+    Smaller results are joined: their size is known, so they are compressed
+    only if bigger than COMPRESS_MIN_SIZE and gzip is applicable to them.
+    """
+    if rows <= STREAM_BATCH_SIZE:
+        chunks = b"".join(chunks)
+    return FlaskResponse(chunks, status=status, mimetype="application/json")
+
+
+@lru_cache(maxsize=64)
+def _resolve_handler(handler_type):
+    """Handler class lookup imports the handler module, so cache it by type."""
+    return get_handler(handler_type)
+
+
+class ORJSONEncoder(JSONEncoder):
+    """Flask JSON encoder which delegates serialization to orjson."""
+
+    def encode(self, o):
+        return _dumps(o).decode("utf-8")
+
 
 class BaseDBWrapper:
-    """Base abstract class contains some general methods."""
+    """Base abstract class contains some general methods.
+
+    Attributes:
+        ROUTES: list of (url, method name, http methods) which become API endpoints
+        ERROR_PREFIXES: error response prefix of an endpoint if it isn't HANDLER_ERROR_PREFIX
+    """
+
+    ROUTES = [("/", "index", ["GET"])]
+    ERROR_PREFIXES = {}
 
     def __init__(self, **kwargs):
-        name = kwargs.get("name", self.__class__.__name__)
+        # class name for log records
+        self._cn = type(self).__name__
+        name = kwargs.get("name", self._cn)
         self.app = Flask(name)
+        # dict responses are serialized by orjson,
+        # request bodies are parsed by _get_payload
+        self.app.json_encoder = ORJSONEncoder
+        # default algorithms order of flask_compress already prefers
+        # zstd/br when they are available and accepted by the client.
+        # COMPRESS_MIN_SIZE applies to responses of known size only,
+        # streamed results (see _chunked_response) are always compressed
+        # and not with gzip, which flask_compress doesn't use for streams.
+        self.app.config["COMPRESS_MIN_SIZE"] = 1024
+        Compress(self.app)
 
-        # self.index becomes a flask API endpoint
-        default_router = self.app.route("/")
-        self.index = default_router(self.index)
-        logger.info(
-            "%s: base params and route have been initialized", self.__class__.__name__
+        # connected handlers are reused between requests.
+        # Each server thread has its own pool: some drivers (e.g. sqlite3)
+        # don't allow to use a connection in another thread. A thread serves
+        # one request at a time, so it keeps one idle handler per connection.
+        # key: (handler_type, serialized handler_kwargs)
+        # value: (handler, time when its connection was last checked,
+        #         time when it was released, generation of the connection),
+        #         the least recently used first
+        self._local = threading.local()
+
+        # generation of each connection, is increased by /disconnect.
+        # Threads close idle handlers of previous generations on their next request.
+        # key: connection key (see above), value: int
+        self._generations = {}
+        self._generations_lock = threading.Lock()
+
+        # results of metadata requests (get_tables, get_columns)
+        # key: (connection key, method name, args)
+        # value: (expiration time, result)
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+        # CONVERT METHODS TO FLASK API ENDPOINTS
+        for url, name, methods in self.ROUTES:
+            self.app.add_url_rule(
+                url, endpoint=name, view_func=self._make_view(name), methods=methods
+            )
+        logger.info("%s: base params and routes have been initialized", self._cn)
+
+    def _make_view(self, name):
+        """Builds view function of the endpoint: the method is called and
+        any exception is turned into 500 response. Everything the view
+        needs besides the method is resolved here, once per endpoint.
+        """
+        method = getattr(self, name)
+        where = f"{self._cn}.{name.lstrip('_')}"
+        prefix = self.ERROR_PREFIXES.get(name, HANDLER_ERROR_PREFIX)
+        err = self._err
+
+        def view():
+            try:
+                return method()
+            except Exception:
+                return err(where, prefix)
+
+        view.__name__ = name
+        return view
+
+    @staticmethod
+    def _err(where, prefix=HANDLER_ERROR_PREFIX):
+        """Logs the exception being handled and returns 500 response with its message.
+        The traceback is formatted by the logger only, it isn't sent to the caller.
+        """
+        logger.exception("%s: error", where)
+        exc = sys.exc_info()[1]
+        msg = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+        return FlaskResponse(
+            prefix + orjson.dumps(msg) + b"}", status=500, mimetype="application/json"
         )
 
     def index(self):
@@ -54,18 +265,170 @@ class BaseDBWrapper:
         return "A DB Service Wrapper", 200
 
     def run(self, **kwargs):
-        """Launch internal Flask application."""
-        self.app.run(**kwargs)
+        """Launch internal Flask application using waitress server.
+
+        Each request is served in a separate thread, so a long DB round-trip
+        doesn't block other requests to the service. Unlike Flask dev server,
+        waitress keeps client connections alive.
+        """
+        params = {"threads": SERVER_THREADS, "connection_limit": 1000}
+        params.update(kwargs)
+        serve(self.app, **params)
 
     def get_handler(self, _json):
-        handler_class = get_handler(_json["handler_type"])
+        handler_class = _resolve_handler(_json["handler_type"])
         logger.info(
             "%s.get_handler: requested instance of %s handler",
-            self.__class__.__name__,
+            self._cn,
             handler_class,
         )
         return handler_class(**_json["handler_kwargs"])
 
+    @staticmethod
+    def _connection_key(_json):
+        kwargs_key = orjson.dumps(
+            _json["handler_kwargs"],
+            default=_default,
+            option=ORJSON_OPTIONS | orjson.OPT_SORT_KEYS,
+        )
+        return _json["handler_type"], kwargs_key
+
+    def _get_idle_handlers(self):
+        idle = getattr(self._local, "idle", None)
+        if idle is None:
+            idle = self._local.idle = {}
+        self._evict_idle_handlers(idle)
+        return idle
+
+    @contextmanager
+    def acquire_handler(self, _json):
+        """Takes a connected handler from the pool or creates a new one.
+        The handler is returned to the pool on exit. It is dropped instead
+        if an exception was raised, since its connection state is unknown.
+        """
+        key = self._connection_key(_json)
+        generation = self._generations.get(key, 0)
+        idle = self._get_idle_handlers()
+        handler, checked_at = self._checkout(idle.pop(key, None), _json)
+        try:
+            yield handler
+        except Exception:
+            self._close_handler(handler)
+            raise
+        self._release(idle, key, handler, checked_at, generation)
+
+    def check_handler(self, _json):
+        """Calls check_connection of the idle handler of the connection or,
+        if there is none, of a new handler without connecting it first, so
+        connection errors are reported by the handler itself. A new handler
+        is connected and pooled if the check succeeds.
+        """
+        key = self._connection_key(_json)
+        generation = self._generations.get(key, 0)
+        idle = self._get_idle_handlers()
+        entry = idle.pop(key, None)
+        handler = entry[0] if entry is not None else self.get_handler(_json)
+        try:
+            result = handler.check_connection()
+            if result.success and entry is None:
+                handler.connect()
+        except Exception:
+            self._close_handler(handler)
+            raise
+        if result.success:
+            self._release(idle, key, handler, time.monotonic(), generation)
+        else:
+            self._close_handler(handler)
+        return result
+
+    def close_handlers(self, _json):
+        """Discards pooled handlers of the connection. The idle handler of
+        the current thread is closed at once. Other threads close theirs when
+        they serve their next request, and handlers in use aren't pooled again.
+        """
+        key = self._connection_key(_json)
+        with self._generations_lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+        self._get_idle_handlers()
+
+    def _release(self, idle, key, handler, checked_at, generation):
+        if generation != self._generations.get(key, 0):
+            # the connection was closed by /disconnect while the handler was in use
+            self._close_handler(handler)
+            return
+        idle[key] = (handler, checked_at, time.monotonic(), generation)
+        # dict keeps insertion order, so the first item is the least recently used one
+        while len(idle) > POOL_MAX_CONNECTIONS:
+            self._close_handler(idle.pop(next(iter(idle)))[0])
+
+    def _evict_idle_handlers(self, idle):
+        """Closes handlers of connections unused for POOL_IDLE_TTL seconds
+        and of connections closed by /disconnect.
+        """
+        now = time.monotonic()
+        for key, (handler, _, released_at, generation) in list(idle.items()):
+            if now - released_at > POOL_IDLE_TTL:
+                logger.info("%s: closing handler of idle connection", self._cn)
+            elif generation != self._generations.get(key, 0):
+                logger.info("%s: closing handler of disconnected connection", self._cn)
+            else:
+                continue
+            del idle[key]
+            self._close_handler(handler)
+
+    def _checkout(self, entry, _json):
+        if entry is not None:
+            handler, checked_at, _, _ = entry
+            now = time.monotonic()
+            if now - checked_at < POOL_CHECK_INTERVAL:
+                return handler, checked_at
+            try:
+                if handler.check_connection().success:
+                    return handler, now
+            except Exception:
+                pass
+            logger.info("%s._checkout: dropping stale handler", self._cn)
+            self._close_handler(handler)
+
+        handler = self.get_handler(_json)
+        handler.connect()
+        return handler, time.monotonic()
+
+    def cached_call(self, _json, method_name, *args):
+        """Calls a handler method, successful results are cached
+        for METADATA_CACHE_TTL seconds. Is used for metadata requests only.
+        """
+        key = (self._connection_key(_json), method_name, args)
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        with self.acquire_handler(_json) as handler:
+            result = getattr(handler, method_name)(*args)
+        if result.resp_type != RESPONSE_TYPE.ERROR:
+            with self._cache_lock:
+                self._cache.pop(key, None)
+                self._cache[key] = (now + METADATA_CACHE_TTL, result)
+                # dict keeps insertion order, so the first item is the oldest one
+                while len(self._cache) > METADATA_CACHE_MAX_SIZE:
+                    del self._cache[next(iter(self._cache))]
+        return result
+
+    def drop_cache(self, _json):
+        """Drops cached results of the connection."""
+        connection_key = self._connection_key(_json)
+        with self._cache_lock:
+            for key in [x for x in self._cache if x[0] == connection_key]:
+                del self._cache[key]
+
+    def _close_handler(self, handler):
+        try:
+            handler.disconnect()
+        except Exception:
+            logger.exception("%s: unable to disconnect handler", self._cn)
+
 
 class DBHandlerWrapper(BaseDBWrapper):
     """A REST API wrapper for DBHandler.
@@ -73,6 +436,22 @@ class DBHandlerWrapper(BaseDBWrapper):
     DBHandler which capable communicate with the caller via REST
     """
 
+    ROUTES = BaseDBWrapper.ROUTES + [
+        ("/connect", "connect", ["GET"]),
+        ("/disconnect", "disconnect", ["POST"]),
+        ("/check_connection", "check_connection", ["GET"]),
+        ("/native_query", "native_query", ["POST", "PUT"]),
+        ("/query", "query", ["POST"]),
+        ("/get_tables", "get_tables", ["GET"]),
+        ("/get_columns", "get_columns", ["GET"]),
+        ("/batch", "_batch", ["POST"]),
+    ]
+    ERROR_PREFIXES = {
+        "connect": CONNECT_ERROR_PREFIX,
+        "disconnect": CONNECT_ERROR_PREFIX,
+        "check_connection": STATUS_ERROR_PREFIX,
+    }
+
     def __init__(self, **kwargs):
         """Wrapper Init.
         Args:
@@ -82,189 +461,107 @@ class DBHandlerWrapper(BaseDBWrapper):
         """
         super().__init__(**kwargs)
 
-        # CONVERT METHODS TO FLASK API ENDPOINTS
-        connect_route = self.app.route(
-            "/connect",
-            methods=[
-                "GET",
-            ],
-        )
-        self.connect = connect_route(self.connect)
-
-        disconnect_route = self.app.route(
-            "/connect",
-            methods=[
-                "GET",
-            ],
-        )
-        self.disconnect = disconnect_route(self.disconnect)
-
-        check_connection_route = self.app.route(
-            "/check_connection",
-            methods=[
-                "GET",
-            ],
-        )
-        self.check_connection = check_connection_route(self.check_connection)
-
-        get_tables_route = self.app.route(
-            "/get_tables",
-            methods=[
-                "GET",
-            ],
-        )
-        self.get_tables = get_tables_route(self.get_tables)
-
-        get_columns_route = self.app.route(
-            "/get_columns",
-            methods=[
-                "GET",
-            ],
-        )
-        self.get_columns = get_columns_route(self.get_columns)
-
-        native_query_route = self.app.route("/native_query", methods=["POST", "PUT"])
-        self.native_query = native_query_route(self.native_query)
-
-        query_route = self.app.route(
-            "/query",
-            methods=[
-                "GET",
-            ],
-        )
-        self.query = query_route(self.query)
-        logger.info(
-            "%s: additional params and routes have been initialized",
-            self.__class__.__name__,
-        )
-
     def connect(self):
-        try:
-            handler = self.get_handler(request.json)
-            handler.connect()
-            return {"status": "OK"}, 200
-        except Exception:
-            msg = traceback.format_exc()
-            logger.error(msg)
-            return {"status": "FAIL", "error": msg}, 500
+        """Makes sure there is a connected handler in the pool."""
+        payload = _get_payload()
+        self.drop_cache(payload)
+        # acquired handler is always connected
+        with self.acquire_handler(payload):
+            pass
+        return {"status": "OK"}, 200
 
     def disconnect(self):
-        try:
-            handler = self.get_handler(request.json)
-            handler.disconnect()
-            return {"status": "OK"}, 200
-        except Exception:
-            msg = traceback.format_exc()
-            logger.error(msg)
-            return {"status": "FAIL", "error": msg}, 500
+        """Discards pooled handlers of the connection, see close_handlers."""
+        payload = _get_payload()
+        self.drop_cache(payload)
+        self.close_handlers(payload)
+        return {"status": "OK"}, 200
 
     def check_connection(self):
         """Check connection to the database server."""
-        logger.info(
-            "%s.check_connection: calling 'check_connection'", self.__class__.__name__
-        )
-        try:
-            handler = self.get_handler(request.json)
-            result = handler.check_connection()
-            return result.to_json(), 200
-        except Exception:
-            msg = traceback.format_exc()
-            logger.error(
-                "%s.check_connection: error - %s", self.__class__.__name__, msg
-            )
-            result = StatusResponse(success=False, error_message=msg)
-            return result.to_json(), 500
+        logger.info("%s.check_connection: calling 'check_connection'", self._cn)
+        payload = _get_payload()
+        result = self.check_handler(payload)
+        return _json_response(result.to_json(), 200)
 
     def native_query(self):
         """Execute received string query."""
-        query = request.json.get("query")
+        payload = _get_payload()
+        query = payload.get("query")
         logger.info(
             "%s.native_query: calling 'native_query' with query - %s",
-            self.__class__.__name__,
+            self._cn,
             query,
         )
-        try:
-            handler = self.get_handler(request.json)
+        with self.acquire_handler(payload) as handler:
             result = handler.native_query(query)
-            return result.to_json(), 200
-        except Exception:
-            msg = traceback.format_exc()
-            logger.error("%s.native_query: error - %s", self.__class__.__name__, msg)
-            result = Response(
-                resp_type=RESPONSE_TYPE.ERROR, error_code=1, error_message=msg
-            )
-            return result.to_json(), 500
+        if result.resp_type == RESPONSE_TYPE.OK:
+            # query without result set might change the schema
+            self.drop_cache(payload)
+        return _stream_response(result, 200)
 
     def query(self):
         """Execute received query object"""
-        logger.info("%s.query: calling", self.__class__.__name__)
-        logger.debug(
-            "%s.query: calling with raw data - %s",
-            self.__class__.__name__,
-            request.get_data(),
-        )
-        try:
-            # Have received json with context and
-            # serialized query object
-            # it is not possible to send json and data separately
-            # so need use base64 to encode serialized object string back in bytes
-            _json_bytes = request.get_data()
-            _json = json.loads(_json_bytes)
-            logger.debug("%s.query: json decoded - %s", self.__class__.__name__, _json)
-            b64_query_bytes = _json["query"].encode("utf-8")
-            s_query = base64.b64decode(b64_query_bytes)
-            query = pickle.loads(s_query)
-        except Exception:
-            msg = traceback.format_exc()
-            logger.error("%s.query: error - %s", self.__class__.__name__, msg)
-            result = Response(
-                resp_type=RESPONSE_TYPE.ERROR, error_code=1, error_message=msg
-            )
-            return result.to_json(), 500
+        # Have received json with context and
+        # query object serialized by ast_to_dict
+        payload = _get_payload()
+        query = dict_to_ast(payload["query_ast"])
 
-        logger.debug(
-            "%s.query: with unpickle query - %s", self.__class__.__name__, query
-        )
-        try:
-            handler = self.get_handler(_json)
+        # avoid repr of the (possibly huge) query if it isn't logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s.query: calling with query - %s", self._cn, query)
+        with self.acquire_handler(payload) as handler:
             result = handler.query(query)
-            return result.to_json(), 200
-        except Exception:
-            msg = traceback.format_exc()
-            logger.error(msg)
-            result = Response(
-                resp_type=RESPONSE_TYPE.ERROR, error_code=1, error_message=msg
-            )
-            return result.to_json(), 500
+        if result.resp_type == RESPONSE_TYPE.OK:
+            # query without result set might change the schema
+            self.drop_cache(payload)
+        return _stream_response(result, 200)
 
     def get_tables(self):
-        logger.info("%s.get_tables: calling.", self.__class__.__name__)
-        try:
-            handler = self.get_handler(request.json)
-            result = handler.get_tables()
-            return result.to_json(), 200
-        except Exception:
-            msg = traceback.format_exc()
-            logger.error("%s.get_tables: error - %s", self.__class__.__name__, msg)
-            result = Response(
-                resp_type=RESPONSE_TYPE.ERROR, error_code=1, error_message=msg
-            )
-            return result.to_json(), 500
+        logger.info("%s.get_tables: calling.", self._cn)
+        payload = _get_payload()
+        result = self.cached_call(payload, "get_tables")
+        return _stream_response(result, 200)
 
     def get_columns(self):
-        logger.info("%s.get_columns: calling", self.__class__.__name__)
-        try:
-            table = request.json.get("table")
-            logger.info(
-                "%s.get_columns: calling for table - %s", self.__class__.__name__, table
-            )
-            handler = self.get_handler(request.json)
-            result = handler.get_columns(table)
-            return result.to_json(), 200
-        except Exception:
-            msg = traceback.format_exc()
-            logger.error("%s.get_columns: error - %s", self.__class__.__name__, msg)
-            result = Response(
-                resp_type=RESPONSE_TYPE.ERROR, error_code=1, error_message=msg
-            )
-            return result.to_json(), 500
+        payload = _get_payload()
+        table = payload.get("table")
+        logger.info("%s.get_columns: calling for table - %s", self._cn, table)
+        result = self.cached_call(payload, "get_columns", table)
+        return _stream_response(result, 200)
+
+    def _batch(self):
+        """Execute several queries using one handler.
+        Isn't public since it isn't a part of DBHandler API.
+
+        'queries' field of the payload is a list of native queries (strings)
+        and/or query objects serialized by ast_to_dict.
+        Returns {"results": [...]} with results in the same format as /query.
+        """
+        payload = _get_payload()
+        queries = [
+            q if isinstance(q, str) else dict_to_ast(q) for q in payload["queries"]
+        ]
+        logger.info("%s.batch: calling for %s queries", self._cn, len(queries))
+        with self.acquire_handler(payload) as handler:
+            results = [
+                handler.native_query(q) if isinstance(q, str) else handler.query(q)
+                for q in queries
+            ]
+        if any(result.resp_type == RESPONSE_TYPE.OK for result in results):
+            self.drop_cache(payload)
+
+        def generate():
+            yield b'{"results":['
+            for i, result in enumerate(results):
+                if i > 0:
+                    yield b","
+                yield from _iter_result(result)
+            yield b"]}"
+
+        rows = sum(
+            len(result.data_frame)
+            for result in results
+            if result.data_frame is not None
+        )
+        return _chunked_response(generate(), rows)
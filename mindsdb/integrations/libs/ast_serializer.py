@@ -0,0 +1,137 @@
+"""JSON compatible serialization of mindsdb_sql query objects.
+
+Is used to send query objects between DBServiceClient and DBHandlerWrapper
+instead of pickle: the result is a plain JSON document and the decoder
+is able to instantiate only mindsdb_sql classes.
+
+    Typical usage example:
+    data = ast_to_dict(query)
+    query = dict_to_ast(data)
+"""
+import importlib
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy import types as sa_types
+
+# only classes from this package may be instantiated on decoding
+ALLOWED_PACKAGE = "mindsdb_sql"
+
+# sqlalchemy type classes which may be used as TableColumn.type
+# (e.g. by IntegrationDataNode.create_table), they are sent by name
+SQL_TYPES = {
+    t.__name__: t
+    for t in (
+        sa_types.Integer,
+        sa_types.BigInteger,
+        sa_types.SmallInteger,
+        sa_types.Float,
+        sa_types.Numeric,
+        sa_types.Boolean,
+        sa_types.String,
+        sa_types.Text,
+        sa_types.Date,
+        sa_types.DateTime,
+        sa_types.Time,
+        sa_types.JSON,
+    )
+}
+
+
+def ast_to_dict(node):
+    """Converts a query object into a JSON compatible structure.
+
+    Sets are memoized, because the parser shares them between nodes
+    (e.g. Identifier.reserved), so each of them is sent only once.
+    """
+    return _encode(node, {})
+
+
+def dict_to_ast(data):
+    """Restores a query object from the result of ast_to_dict."""
+    return _decode(data, {})
+
+
+def _encode(value, memo):
+    if isinstance(value, np.generic):
+        # numpy scalars from data frames, e.g. Constant(np.int64(1))
+        value = value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [_encode(x, memo) for x in value]
+    if isinstance(value, tuple):
+        return {"__tuple__": [_encode(x, memo) for x in value]}
+    if isinstance(value, set):
+        key = id(value)
+        if key in memo:
+            return {"__ref__": memo[key]}
+        memo[key] = len(memo)
+        # sort to make the result deterministic
+        items = sorted((_encode(x, memo) for x in value), key=repr)
+        return {"__set__": items, "__id__": memo[key]}
+    if isinstance(value, dict):
+        return {"__dict__": [[_encode(k, memo), _encode(v, memo)] for k, v in value.items()]}
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"__decimal__": str(value)}
+    if isinstance(value, type) and SQL_TYPES.get(value.__name__) is value:
+        return {"__sqltype__": value.__name__}
+
+    cls = type(value)
+    if cls.__module__.split(".")[0] == ALLOWED_PACKAGE and hasattr(value, "__dict__"):
+        return {
+            "__ast__": f"{cls.__module__}:{cls.__qualname__}",
+            "fields": {k: _encode(v, memo) for k, v in vars(value).items()},
+        }
+    raise TypeError(f"Unable to serialize object of type {cls}")
+
+
+def _decode(value, memo):
+    if isinstance(value, list):
+        return [_decode(x, memo) for x in value]
+    if not isinstance(value, dict):
+        return value
+
+    if "__ast__" in value:
+        cls = _get_class(value["__ast__"])
+        node = cls.__new__(cls)
+        node.__dict__.update({k: _decode(v, memo) for k, v in value["fields"].items()})
+        return node
+    if "__tuple__" in value:
+        return tuple(_decode(x, memo) for x in value["__tuple__"])
+    if "__ref__" in value:
+        return memo[value["__ref__"]]
+    if "__set__" in value:
+        result = set()
+        # register before filling to keep the same order of ids as in encoder
+        memo[value["__id__"]] = result
+        result.update(_decode(x, memo) for x in value["__set__"])
+        return result
+    if "__dict__" in value:
+        return {_decode(k, memo): _decode(v, memo) for k, v in value["__dict__"]}
+    if "__datetime__" in value:
+        return datetime.fromisoformat(value["__datetime__"])
+    if "__date__" in value:
+        return date.fromisoformat(value["__date__"])
+    if "__decimal__" in value:
+        return Decimal(value["__decimal__"])
+    if "__sqltype__" in value:
+        return SQL_TYPES[value["__sqltype__"]]
+    raise ValueError(f"Unknown serialized object: {list(value.keys())}")
+
+
+def _get_class(path):
+    module_name, _, qualname = path.partition(":")
+    if module_name.split(".")[0] != ALLOWED_PACKAGE:
+        raise ValueError(f"Class from not allowed module: {module_name}")
+    obj = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr)
+    if not isinstance(obj, type) or obj.__module__ != module_name:
+        raise ValueError(f"Not a class of module {module_name}: {qualname}")
+    return obj
@@ -0,0 +1,71 @@
+import json
+
+import numpy as np
+import pytest
+
+from mindsdb_sql import parse_sql
+from mindsdb_sql.parser.ast import Constant, CreateTable, Identifier, Select, TableColumn
+from sqlalchemy.types import Float, Integer, Text
+
+from mindsdb.integrations.libs.ast_serializer import ast_to_dict, dict_to_ast
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "select * from tbl where a > '2020-01-01' and b in (1, 2, 3) and c is null",
+        "select a, count(*) as cnt from tbl group by a order by cnt desc limit 10",
+        "select a from (select * from tbl) as t1 join tbl2 on t1.a = tbl2.a union select 1",
+        "insert into tbl (a, b) values (1, 'x'), (2, 'y')",
+    ],
+)
+def test_round_trip(sql):
+    query = parse_sql(sql, dialect="mindsdb")
+    data = json.loads(json.dumps(ast_to_dict(query)))
+    restored = dict_to_ast(data)
+    assert restored == query
+    assert str(restored) == str(query)
+
+
+def test_shared_sets_sent_once():
+    query = parse_sql("select a, b from tbl", dialect="mindsdb")
+    data = ast_to_dict(query)
+    assert json.dumps(data).count('"__set__"') == 1
+
+    restored = dict_to_ast(data)
+    assert restored.targets[0].reserved is restored.targets[1].reserved
+
+
+def test_create_table_with_sqlalchemy_types():
+    # as it is built by IntegrationDataNode.create_table
+    query = CreateTable(
+        name=Identifier(parts=["int", "tbl"]),
+        columns=[
+            TableColumn(name="a", type=Integer),
+            TableColumn(name="b", type=Float),
+            TableColumn(name="c", type=Text),
+        ],
+        is_replace=True,
+    )
+    data = json.loads(json.dumps(ast_to_dict(query)))
+    restored = dict_to_ast(data)
+    assert [(c.name, c.type) for c in restored.columns] == [("a", Integer), ("b", Float), ("c", Text)]
+    assert restored == query
+
+
+def test_numpy_constants():
+    query = Select(targets=[Constant(np.int64(1)), Constant(np.float64(0.5)), Constant(np.bool_(True))])
+    data = json.loads(json.dumps(ast_to_dict(query)))
+    restored = dict_to_ast(data)
+    values = [t.value for t in restored.targets]
+    assert values == [1, 0.5, True]
+    assert [type(x) for x in values] == [int, float, bool]
+    assert restored == Select(targets=[Constant(1), Constant(0.5), Constant(True)])
+
+
+@pytest.mark.parametrize(
+    "path", ["os:system", "subprocess:Popen", "mindsdb_sql:parse_sql"]
+)
+def test_not_allowed_classes(path):
+    with pytest.raises(ValueError):
+        dict_to_ast({"__ast__": path, "fields": {}})
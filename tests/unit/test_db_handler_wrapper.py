@@ -0,0 +1,347 @@
+import os
+import time
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from unittest import mock
+
+import numpy as np
+import orjson
+import pandas as pd
+from mindsdb_sql import parse_sql
+
+from mindsdb.integrations.handlers.sqlite_handler.sqlite_handler import SQLiteHandler
+from mindsdb.integrations.handlers_client.base_client import BaseClient
+from mindsdb.integrations.handlers_wrapper import db_handler_wrapper
+from mindsdb.integrations.handlers_wrapper.db_handler_wrapper import DBHandlerWrapper, _iter_result
+from mindsdb.integrations.libs.ast_serializer import ast_to_dict
+from mindsdb.integrations.libs.response import HandlerResponse, HandlerStatusResponse, RESPONSE_TYPE
+
+
+class TestDBHandlerWrapper(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.db_file = tempfile.mkstemp(prefix='mindsdb_wrapper_test_', suffix='.db')
+        os.close(fd)
+        self.payload = {
+            'handler_type': 'sqlite',
+            'handler_kwargs': {'name': 'test_sqlite', 'connection_data': {'db_file': self.db_file}},
+        }
+
+        self.wrapper = DBHandlerWrapper(name='test_wrapper')
+        self.client = self.wrapper.app.test_client()
+
+        # keep all handlers created by the wrapper
+        self.handlers = []
+        get_handler = self.wrapper.get_handler
+
+        def spy(_json):
+            handler = get_handler(_json)
+            self.handlers.append(handler)
+            return handler
+
+        self.wrapper.get_handler = spy
+
+    def tearDown(self):
+        for handler in self.handlers:
+            handler.disconnect()
+        os.remove(self.db_file)
+
+    def call(self, endpoint, method='get', **fields):
+        data = orjson.dumps(dict(self.payload, **fields))
+        return getattr(self.client, method)(f'/{endpoint}', data=data)
+
+    def test_handler_reuse(self):
+        for _ in range(3):
+            resp = self.call('native_query', 'post', query='select 1 as a')
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(orjson.loads(resp.data)['data_frame'], {'columns': ['a'], 'data': [[1]]})
+        self.assertEqual(len(self.handlers), 1)
+        self.assertTrue(self.handlers[0].is_connected)
+
+    def test_stale_handler_dropped(self):
+        self.call('native_query', 'post', query='select 1')
+        handler = self.handlers[0]
+
+        # within the interval the handler isn't checked
+        with mock.patch.object(handler, 'check_connection') as check:
+            self.call('native_query', 'post', query='select 1')
+            check.assert_not_called()
+
+        failed = HandlerStatusResponse(False, error_message='connection lost')
+        with mock.patch.object(db_handler_wrapper, 'POOL_CHECK_INTERVAL', 0), \
+                mock.patch.object(handler, 'check_connection', return_value=failed) as check:
+            resp = self.call('native_query', 'post', query='select 1')
+            check.assert_called_once()
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(self.handlers), 2)
+        self.assertFalse(handler.is_connected)
+
+    def test_frequently_used_handler_checked(self):
+        # the interval is counted from the last check, not from the last use
+        self.call('native_query', 'post', query='select 1')
+        handler = self.handlers[0]
+        with mock.patch.object(db_handler_wrapper, 'POOL_CHECK_INTERVAL', 0.2), \
+                mock.patch.object(handler, 'check_connection', wraps=handler.check_connection) as check:
+            for _ in range(4):
+                time.sleep(0.1)
+                self.call('native_query', 'post', query='select 1')
+        self.assertGreater(check.call_count, 0)
+        self.assertEqual(len(self.handlers), 1)
+
+    def test_raised_handler_closed(self):
+        self.call('native_query', 'post', query='select 1')
+        handler = self.handlers[0]
+
+        with mock.patch.object(handler, 'native_query', side_effect=RuntimeError('broken')):
+            resp = self.call('native_query', 'post', query='select 1')
+        self.assertEqual(resp.status_code, 500)
+        self.assertEqual(orjson.loads(resp.data)['error'], 'RuntimeError: broken')
+        self.assertFalse(handler.is_connected)
+
+        resp = self.call('native_query', 'post', query='select 1')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(self.handlers), 2)
+
+    def test_small_results_not_streamed(self):
+        headers = {'Accept-Encoding': 'gzip'}
+        resp = self.client.post(
+            '/native_query', data=orjson.dumps(dict(self.payload, query='select 1')), headers=headers
+        )
+        self.assertIsNone(resp.headers.get('Content-Encoding'))
+
+        # one batch of rows, bigger than COMPRESS_MIN_SIZE
+        query = "with recursive c(x) as (select 1 union all select x + 1 from c limit 1000) select x from c"
+        resp = self.client.post('/native_query', data=orjson.dumps(dict(self.payload, query=query)), headers=headers)
+        self.assertEqual(resp.headers.get('Content-Encoding'), 'gzip')
+
+    def call_as(self, name, query='select 1'):
+        # handler_kwargs are a part of the pool key
+        data = orjson.dumps({
+            'handler_type': 'sqlite',
+            'handler_kwargs': {'name': name, 'connection_data': {'db_file': self.db_file}},
+            'query': query,
+        })
+        resp = self.client.post('/native_query', data=data)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_disconnect_closes_handlers(self):
+        self.call('native_query', 'post', query='select 1')
+        self.assertEqual(self.call('disconnect', 'post').status_code, 200)
+        self.assertFalse(self.handlers[0].is_connected)
+
+        self.call('native_query', 'post', query='select 1')
+        self.assertEqual(len(self.handlers), 2)
+        self.assertTrue(self.handlers[1].is_connected)
+
+    def test_disconnect_in_other_thread(self):
+        with ThreadPoolExecutor(max_workers=1) as worker:
+            worker.submit(self.call, 'native_query', 'post', query='select 1').result()
+            self.assertEqual(self.call('disconnect', 'post').status_code, 200)
+            # the handler belongs to the worker thread, it is closed by the worker
+            self.assertTrue(self.handlers[0].is_connected)
+
+            worker.submit(self.call_as, 'other').result()
+            self.assertFalse(self.handlers[0].is_connected)
+            worker.submit(self.call, 'native_query', 'post', query='select 1').result()
+            self.assertEqual(len(self.handlers), 3)
+            # sqlite connections can be closed only by their thread
+            for handler in self.handlers:
+                worker.submit(handler.disconnect).result()
+
+    def test_idle_pools_closed(self):
+        self.call_as('first')
+        self.call_as('second')
+        with mock.patch.object(db_handler_wrapper, 'POOL_IDLE_TTL', 0):
+            time.sleep(0.01)
+            self.call_as('third')
+        self.assertEqual([h.is_connected for h in self.handlers], [False, False, True])
+
+    def test_pools_number_limited(self):
+        with mock.patch.object(db_handler_wrapper, 'POOL_MAX_CONNECTIONS', 2):
+            self.call_as('first')
+            self.call_as('second')
+            # the least recently used one is closed
+            self.call_as('first')
+            self.call_as('third')
+        self.assertEqual(len(self.handlers), 3)
+        self.assertEqual([h.is_connected for h in self.handlers], [True, False, True])
+
+    def test_failed_connect_not_pooled(self):
+        bad_payload = {
+            'handler_type': 'sqlite',
+            'handler_kwargs': {'name': 'bad', 'connection_data': {'db_file': '/nonexistent/dir/x.db'}},
+            'query': 'select 1',
+        }
+        with mock.patch.object(db_handler_wrapper, 'POOL_MAX_CONNECTIONS', 1):
+            self.call_as('first')
+            resp = self.client.post('/native_query', data=orjson.dumps(bad_payload))
+            self.assertEqual(resp.status_code, 500)
+            self.call_as('first')
+        self.assertEqual(len(self.handlers), 2)
+        self.assertTrue(self.handlers[0].is_connected)
+
+    def test_check_connection(self):
+        resp = self.call('check_connection')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(orjson.loads(resp.data), {'success': True, 'error': None})
+        # the checked handler is pooled
+        self.call('native_query', 'post', query='select 1')
+        self.assertEqual(len(self.handlers), 1)
+        self.assertTrue(self.handlers[0].is_connected)
+
+        # the idle handler is checked
+        with mock.patch.object(self.handlers[0], 'check_connection', wraps=self.handlers[0].check_connection) as check:
+            self.assertEqual(self.call('check_connection').status_code, 200)
+            check.assert_called_once()
+        self.assertEqual(len(self.handlers), 1)
+
+    def test_check_connection_failed(self):
+        self.payload['handler_kwargs']['connection_data']['db_file'] = '/nonexistent/dir/x.db'
+        resp = self.call('check_connection')
+        self.assertEqual(resp.status_code, 200)
+        result = orjson.loads(resp.data)
+        self.assertFalse(result['success'])
+        self.assertIn('unable to open database file', result['error'])
+        self.assertFalse(self.handlers[0].is_connected)
+
+        # a failed handler isn't pooled
+        self.call('check_connection')
+        self.assertEqual(len(self.handlers), 2)
+
+    def table_names(self):
+        resp = self.call('get_tables')
+        self.assertEqual(resp.status_code, 200)
+        return [row[0] for row in orjson.loads(resp.data)['data_frame']['data']]
+
+    def test_metadata_cache(self):
+        self.call('native_query', 'post', query='create table t1 (a int)')
+        with mock.patch.object(SQLiteHandler, 'get_tables', autospec=True, side_effect=SQLiteHandler.get_tables) as spy:
+            self.assertEqual(self.table_names(), ['t1'])
+            # within TTL without DDL the cached result is used
+            self.assertEqual(self.table_names(), ['t1'])
+            self.assertEqual(spy.call_count, 1)
+
+            # query without result set drops the cache
+            self.call('native_query', 'post', query='create table t2 (a int)')
+            self.assertEqual(self.table_names(), ['t1', 't2'])
+            self.assertEqual(spy.call_count, 2)
+
+            # query with result set doesn't
+            self.call('native_query', 'post', query='select 1')
+            self.table_names()
+            self.assertEqual(spy.call_count, 2)
+
+            for endpoint, method in (('connect', 'get'), ('disconnect', 'post')):
+                self.assertEqual(self.call(endpoint, method).status_code, 200)
+                self.table_names()
+            self.assertEqual(spy.call_count, 4)
+
+            with mock.patch.object(db_handler_wrapper, 'METADATA_CACHE_TTL', 0):
+                self.call('disconnect', 'post')
+                self.table_names()
+                self.table_names()
+            self.assertEqual(spy.call_count, 6)
+
+    def test_metadata_cache_size(self):
+        for name in ('t1', 't2', 't3'):
+            self.call('native_query', 'post', query=f'create table {name} (a int)')
+        with mock.patch.object(db_handler_wrapper, 'METADATA_CACHE_MAX_SIZE', 2):
+            for name in ('t1', 't2', 't3'):
+                resp = self.call('get_columns', table=name)
+                self.assertEqual(resp.status_code, 200)
+        self.assertEqual([key[2] for key in self.wrapper._cache], [('t2',), ('t3',)])
+
+    def test_batch(self):
+        self.call('native_query', 'post', query='create table t1 (a int)')
+        queries = [
+            'insert into t1 values (1), (2)',
+            ast_to_dict(parse_sql('select a from t1 order by a', dialect='mindsdb')),
+            'select * from missing_table',
+        ]
+        resp = self.call('batch', 'post', queries=queries)
+        self.assertEqual(resp.status_code, 200)
+
+        results = orjson.loads(resp.data)['results']
+        self.assertEqual([r['type'] for r in results], [RESPONSE_TYPE.OK, RESPONSE_TYPE.TABLE, RESPONSE_TYPE.ERROR])
+        self.assertEqual(results[1]['data_frame'], {'columns': ['a'], 'data': [[1], [2]]})
+        self.assertIn('missing_table', results[2]['error'])
+        self.assertEqual(len(self.handlers), 1)
+
+    def test_batch_error(self):
+        queries = ['select 1', {'__ast__': 'os:system', 'fields': {}}]
+        resp = self.call('batch', 'post', queries=queries)
+        self.assertEqual(resp.status_code, 500)
+        self.assertEqual(orjson.loads(resp.data)['type'], RESPONSE_TYPE.ERROR)
+
+        self.call('native_query', 'post', query='select 1')
+        handler = self.handlers[0]
+        with mock.patch.object(handler, 'query', side_effect=RuntimeError('broken')):
+            queries = ['select 1', ast_to_dict(parse_sql('select 1', dialect='mindsdb'))]
+            resp = self.call('batch', 'post', queries=queries)
+        self.assertEqual(resp.status_code, 500)
+        self.assertEqual(orjson.loads(resp.data)['error'], 'RuntimeError: broken')
+        self.assertFalse(handler.is_connected)
+
+
+class TestResultWireFormat(unittest.TestCase):
+
+    def round_trip(self, df):
+        result = HandlerResponse(RESPONSE_TYPE.TABLE, data_frame=df)
+        # several batches of rows
+        with mock.patch.object(db_handler_wrapper, 'STREAM_BATCH_SIZE', 2):
+            data = b''.join(_iter_result(result))
+        resp = BaseClient()._convert_response(orjson.loads(data))
+        self.assertEqual(resp['type'], RESPONSE_TYPE.TABLE)
+        return resp['data_frame']
+
+    def test_data_frame(self):
+        df = pd.DataFrame({
+            'i': [1, 2, 3],
+            'f': [1.5, np.nan, None],
+            'd': [Decimal('1.25'), None, Decimal('2')],
+            't': [pd.Timestamp('2020-01-02 03:04:05'), pd.NaT, pd.Timestamp('2021-01-01')],
+            's': ['a', None, 'c'],
+        })
+        restored = self.round_trip(df)
+
+        self.assertEqual(list(restored.columns), list(df.columns))
+        self.assertEqual(restored['i'].tolist(), [1, 2, 3])
+        pd.testing.assert_series_equal(restored['f'], df['f'])
+        pd.testing.assert_series_equal(restored['d'], pd.Series([1.25, np.nan, 2.0], name='d'))
+        # datetimes are sent as ISO strings, NaT as null
+        pd.testing.assert_series_equal(pd.to_datetime(restored['t']), df['t'], check_dtype=False)
+        self.assertEqual(restored['s'][0], 'a')
+        self.assertTrue(pd.isna(restored['s'][1]))
+
+    def test_same_dtypes_as_split_json(self):
+        df = pd.DataFrame({
+            'created_at': [pd.Timestamp('2020-01-02 03:04:05'), pd.NaT],
+            'date': ['2021-01-01', None],
+            'x': [1, 2],
+            'y': [0.5, None],
+            's': ['a', 'b'],
+        })
+        restored = self.round_trip(df)
+        resp = BaseClient()._convert_response({'data_frame': df.to_json(orient='split', date_format='iso')})
+        pd.testing.assert_frame_equal(restored, resp['data_frame'])
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(restored['created_at']))
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(restored['date']))
+
+    def test_naive_datetimes(self):
+        # datetime64 and object columns give the same strings without a timezone
+        values = [datetime(2020, 1, 2, 3, 4, 5), datetime(2021, 1, 1, 0, 0, 0, 123456)]
+        df = pd.DataFrame({'t64': pd.to_datetime(values), 'obj': pd.Series(values, dtype=object)})
+        result = HandlerResponse(RESPONSE_TYPE.TABLE, data_frame=df)
+        data = orjson.loads(b''.join(_iter_result(result)))['data_frame']['data']
+        self.assertEqual(data, [
+            ['2020-01-02T03:04:05', '2020-01-02T03:04:05'],
+            ['2021-01-01T00:00:00.123456', '2021-01-01T00:00:00.123456'],
+        ])
+
+    def test_empty_data_frame(self):
+        restored = self.round_trip(pd.DataFrame(columns=['a', 'b']))
+        self.assertEqual(list(restored.columns), ['a', 'b'])
+        self.assertEqual(len(restored), 0)